@@ -0,0 +1,34 @@
+import importlib
+
+# public name -> module defining it. Modules are imported on first access so that
+# `import charm_shin_han` (or loading DataMaker alone) does not pull in torch, transformers, pandas, ...
+_LAZY_ATTRIBUTES = {
+  'ConfusionMatrix': 'confusion_matrix',
+  'DataMaker': 'data_maker',
+  'MinHashDeduplicator': 'deduplicator',
+  'DistillationConfig': 'distillation_config',
+  'DistillationTrainer': 'distillation_trainer',
+  'HyperparameterSweeper': 'hyperparameter_sweeper',
+  'MicroBatchingServer': 'inference_server',
+  'KeywordExtracter': 'keyword_extracter',
+  'KobertClassficationTrainer': 'kobert_classification_trainer',
+  'KoBERTConfig': 'kobert_config',
+  'KoElectraClassificationTrainer': 'koelectra_classification_trainer',
+  'KoELECTRAConfig': 'koelectra_config',
+  'PerformanceConfig': 'performance_config',
+  'ClassifierPredictor': 'predictor',
+  'TrainingEngine': 'training_engine',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+def __getattr__(name):
+  if name not in _LAZY_ATTRIBUTES:
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+  module = importlib.import_module('.' + _LAZY_ATTRIBUTES[name], __name__)
+  value = getattr(module, name)
+  globals()[name] = value
+  return value
+
+def __dir__():
+  return sorted(list(globals()) + __all__)
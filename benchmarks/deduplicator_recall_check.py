@@ -0,0 +1,80 @@
+"""Recall check of MinHashDeduplicator on synthetic near-duplicate pairs.
+
+Makes pairs of random reviews with a few characters changed, measures their
+exact Jaccard similarity (of the same character shingles the deduplicator
+uses) and reports how often each similarity range is merged. Fails (exit
+code 1) when pairs clearly above the threshold survive deduplication or
+pairs clearly below it are merged.
+
+    python -m charm_shin_han.benchmarks.deduplicator_recall_check
+    python -m charm_shin_han.benchmarks.deduplicator_recall_check --threshold 0.9 --pairs 2000
+"""
+import argparse
+import sys
+import numpy as np
+from ..deduplicator import MinHashDeduplicator, hash_shingles, normalize
+
+# first and last hangul syllables, reviews are random syllables
+HANGUL_START = 0xAC00
+HANGUL_END = 0xD7A3
+
+def jaccard(text_a, text_b, shingle_size):
+	shingles_a = set(hash_shingles(normalize(text_a), shingle_size).tolist())
+	shingles_b = set(hash_shingles(normalize(text_b), shingle_size).tolist())
+	return len(shingles_a & shingles_b) / len(shingles_a | shingles_b)
+
+def make_pair(random_state, length, num_changes):
+	text = random_state.randint(HANGUL_START, HANGUL_END + 1, size = length)
+	changed = text.copy()
+	positions = random_state.choice(length, size = num_changes, replace = False)
+	changed[positions] = random_state.randint(HANGUL_START, HANGUL_END + 1, size = num_changes)
+	return ''.join(map(chr, text)), ''.join(map(chr, changed))
+
+def main():
+	parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--threshold', type = float, default = 0.8)
+	parser.add_argument('--num-perm', type = int, default = 128)
+	parser.add_argument('--pairs', type = int, default = 1000)
+	parser.add_argument('--length', type = int, default = 200, help = 'characters of one review')
+	parser.add_argument('--margin', type = float, default = 0.04, help = 'pairs at least this far from the threshold are checked')
+	parser.add_argument('--min-recall', type = float, default = 0.9, help = 'merged ratio required above threshold + margin')
+	parser.add_argument('--max-false-merge', type = float, default = 0.05, help = 'merged ratio allowed below threshold - margin')
+	parser.add_argument('--seed', type = int, default = 0)
+	args = parser.parse_args()
+
+	deduplicator = MinHashDeduplicator(threshold = args.threshold, num_perm = args.num_perm)
+	random_state = np.random.RandomState(args.seed)
+	# a shingle is touched by shingle_size changes at most, so this range covers similarities around the threshold
+	max_changes = max(1, int(args.length * (1 - args.threshold) * 1.5 / deduplicator.shingle_size))
+
+	similarities = []
+	merged = []
+	for _ in range(args.pairs):
+		text, changed = make_pair(random_state, args.length, random_state.randint(1, max_changes + 1))
+		deduplicator.reset()
+		deduplicator.add(text)
+		similarities.append(jaccard(text, changed, deduplicator.shingle_size))
+		merged.append(deduplicator.query(changed) >= 0)
+	similarities = np.array(similarities)
+	merged = np.array(merged)
+
+	print('threshold {} / {} bands x {} rows\n'.format(args.threshold, deduplicator.num_bands, deduplicator.band_rows))
+	print('{:<16}{:>8}{:>10}'.format('jaccard', 'pairs', 'merged'))
+	edges = np.round(np.arange(args.threshold - 0.2, 1.0 + 1e-9, 0.02), 2)
+	for low, high in zip(edges[:-1], edges[1:]):
+		in_range = (similarities >= low) & (similarities < high)
+		if in_range.any():
+			print('{:<16}{:>8}{:>10.2f}'.format('{:.2f} - {:.2f}'.format(low, high), int(in_range.sum()), merged[in_range].mean()))
+
+	above = similarities >= args.threshold + args.margin
+	below = similarities < args.threshold - args.margin
+	recall = merged[above].mean() if above.any() else 1.0
+	false_merge = merged[below].mean() if below.any() else 0.0
+	print('\nmerged above {:.2f}: {:.3f} / merged below {:.2f}: {:.3f}'.format(args.threshold + args.margin, recall, args.threshold - args.margin, false_merge))
+
+	if recall < args.min_recall or false_merge > args.max_false_merge:
+		print('\nFAILED: the LSH bands should make pairs above the threshold candidates')
+		sys.exit(1)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,90 @@
+"""Import-time benchmark for the package modules.
+
+Imports every module in a fresh interpreter, reports the import time and fails
+(exit code 1) when a module takes longer than --max-ms or loads a heavy backend
+(torch, transformers, pandas, ...) at import time.
+
+    python -m charm_shin_han.benchmarks.import_time_benchmark
+    python -m charm_shin_han.benchmarks.import_time_benchmark --max-ms 300 --repeat 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+MODULES = [
+	'',
+	'confusion_matrix',
+	'data_maker',
+	'deduplicator',
+	'distillation_config',
+	'distillation_trainer',
+	'hyperparameter_sweeper',
+	'inference_server',
+	'keyword_extracter',
+	'kobert_classification_trainer',
+	'kobert_config',
+	'koelectra_classification_trainer',
+	'koelectra_config',
+	'performance_config',
+	'predictor',
+	'progress',
+	'sequence_length',
+	'training_engine',
+]
+
+# backends that should only be imported when they are used
+HEAVY_MODULES = ['torch', 'transformers', 'gluonnlp', 'mxnet', 'kobert', 'pandas', 'IPython', 'tqdm', 'mecab', 'sklearn', 'matplotlib']
+
+MEASURE_CODE = '''
+import importlib, json, sys, time
+start_time = time.perf_counter()
+importlib.import_module({module!r})
+elapsed = time.perf_counter() - start_time
+print(json.dumps({{'ms': elapsed * 1000, 'heavy': [name for name in {heavy!r} if name in sys.modules]}}))
+'''
+
+def measure(module, package_parent):
+	code = MEASURE_CODE.format(module = module, heavy = HEAVY_MODULES)
+	env = dict(os.environ, PYTHONPATH = package_parent + os.pathsep + os.environ.get('PYTHONPATH', ''))
+	completed = subprocess.run([sys.executable, '-c', code], capture_output = True, text = True, env = env)
+	if completed.returncode != 0:
+		return None, completed.stderr.strip().splitlines()[-1]
+	return json.loads(completed.stdout.strip().splitlines()[-1]), None
+
+def main():
+	parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--max-ms', type = float, default = 250, help = 'import time budget of one module')
+	parser.add_argument('--repeat', type = int, default = 3, help = 'fresh interpreters per module, the fastest run is reported')
+	args = parser.parse_args()
+
+	package = __package__.split('.')[0]
+	package_parent = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+	failed = False
+	print('{:<50}{:>10}  {}'.format('module', 'ms', 'heavy backends loaded'))
+	for module in MODULES:
+		name = package + '.' + module if module else package
+		best = None
+		error = None
+		for _ in range(args.repeat):
+			result, error = measure(name, package_parent)
+			if result is None:
+				break
+			if best is None or result['ms'] < best['ms']:
+				best = result
+		if best is None:
+			print('{:<50}{:>10}  {}'.format(name, 'error', error))
+			failed = True
+			continue
+		slow = best['ms'] > args.max_ms
+		failed = failed or slow or bool(best['heavy'])
+		print('{:<50}{:>10.1f}  {}{}'.format(name, best['ms'], ', '.join(best['heavy']) or '-', '  (over budget)' if slow else ''))
+
+	if failed:
+		print('\nFAILED: keep heavy imports inside the functions that use them')
+		sys.exit(1)
+
+if __name__ == '__main__':
+	main()
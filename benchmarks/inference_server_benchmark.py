@@ -0,0 +1,124 @@
+"""Load generator for MicroBatchingServer.
+
+Sends requests at a fixed average rate (Poisson arrivals) and reports latency
+percentiles and throughput for every batching setting.
+
+    python -m charm_shin_han.benchmarks.inference_server_benchmark
+    python -m charm_shin_han.benchmarks.inference_server_benchmark --rate 500 --batch-sizes 1 8 32 --wait-ms 0 2 10
+
+Without --model-path the model is simulated by a fixed cost per batch plus a
+cost per text, which is how a transformer classifier behaves on one device.
+"""
+import argparse
+import asyncio
+import random
+import time
+from ..inference_server import MicroBatchingServer, ServerOverloadedError
+
+class SimulatedModel:
+	def __init__(self, batch_cost, item_cost):
+		self.batch_cost = batch_cost
+		self.item_cost = item_cost
+
+	def __call__(self, texts):
+		# sleep releases the GIL like a torch forward pass does
+		time.sleep(self.batch_cost + self.item_cost * len(texts))
+		return [0] * len(texts)
+
+def load_predict_fn(model_type, model_path, num_labels, max_len, device_name):
+	import torch
+	from ..predictor import ClassifierPredictor
+	device = torch.device(device_name)
+	if model_type == 'kobert':
+		from ..kobert_config import KoBERTConfig
+		from ..kobert_classification_trainer import KobertClassficationTrainer
+		config = KoBERTConfig(num_of_classes=num_labels, max_len=max_len, batch_size=1, warmup_ratio=0, num_epochs=1, max_grad_norm=1, log_interval=1, learning_rate=0)
+		trainer = KobertClassficationTrainer()
+		backbone, tokenizer = trainer.load_pretrained()
+		model = trainer.build_model(backbone, config)
+		model.load_state_dict(torch.load(model_path, map_location=device))
+	else:
+		from ..koelectra_config import KoELECTRAConfig
+		from ..koelectra_classification_trainer import KoElectraClassificationTrainer
+		config = KoELECTRAConfig(n_epoch=1, batch_size=1, save_step=1, num_label=num_labels, max_seq_len=max_len, learning_rate=0)
+		trainer = KoElectraClassificationTrainer()
+		backbone, tokenizer = trainer.load_pretrained()
+		model = trainer.build_model(backbone, config)
+		model.load_state_dict(torch.load(model_path, map_location=device)['model_state_dict'])
+	return ClassifierPredictor(model, tokenizer, config, device).predict
+
+def percentile(values, q):
+	ordered = sorted(values)
+	index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+	return ordered[index]
+
+async def run_load(predict_fn, texts, max_batch_size, max_wait_time, rate, duration, max_queue_size):
+	latencies = []
+	rejected = 0
+
+	async def one_request(server, text):
+		nonlocal rejected
+		start_time = time.perf_counter()
+		try:
+			await server.classify(text, block = False)
+		except ServerOverloadedError:
+			rejected += 1
+			return
+		latencies.append(time.perf_counter() - start_time)
+
+	server = MicroBatchingServer(predict_fn, max_batch_size = max_batch_size, max_wait_time = max_wait_time, max_queue_size = max_queue_size)
+	async with server:
+		tasks = []
+		start_time = time.perf_counter()
+		next_time = start_time
+		while next_time - start_time < duration:
+			delay = next_time - time.perf_counter()
+			if delay > 0:
+				await asyncio.sleep(delay)
+			tasks.append(asyncio.create_task(one_request(server, random.choice(texts))))
+			next_time += random.expovariate(rate)
+		await asyncio.gather(*tasks)
+		elapsed = time.perf_counter() - start_time
+
+	return {
+		'max_batch_size': max_batch_size,
+		'max_wait_ms': max_wait_time * 1000,
+		'requests': len(latencies),
+		'rejected': rejected,
+		'throughput': len(latencies) / elapsed,
+		'p50_ms': percentile(latencies, 50) * 1000 if latencies else float('nan'),
+		'p99_ms': percentile(latencies, 99) * 1000 if latencies else float('nan'),
+		'mean_batch': sum(server.batch_sizes) / len(server.batch_sizes) if server.batch_sizes else 0,
+	}
+
+def main():
+	parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--rate', type = float, default = 300, help = 'average requests per second')
+	parser.add_argument('--duration', type = float, default = 5, help = 'seconds of load per setting')
+	parser.add_argument('--batch-sizes', type = int, nargs = '+', default = [1, 8, 32, 64])
+	parser.add_argument('--wait-ms', type = float, nargs = '+', default = [0, 2, 10])
+	parser.add_argument('--max-queue-size', type = int, default = 1024)
+	parser.add_argument('--batch-cost-ms', type = float, default = 10, help = 'simulated model: cost of one forward pass')
+	parser.add_argument('--item-cost-ms', type = float, default = 0.5, help = 'simulated model: extra cost of each text')
+	parser.add_argument('--model-path', help = 'trained model (.pt/.pth) to benchmark instead of the simulated model')
+	parser.add_argument('--model-type', choices = ['kobert', 'koelectra'], default = 'koelectra')
+	parser.add_argument('--num-labels', type = int, default = 7)
+	parser.add_argument('--max-len', type = int, default = 128)
+	parser.add_argument('--device', default = 'cpu')
+	args = parser.parse_args()
+
+	if args.model_path:
+		predict_fn = load_predict_fn(args.model_type, args.model_path, args.num_labels, args.max_len, args.device)
+	else:
+		predict_fn = SimulatedModel(args.batch_cost_ms / 1000, args.item_cost_ms / 1000)
+	texts = ['앱이 안돼요', '로그인이 자꾸 풀려요', '이체 한도 변경은 어디서 하나요?', '업데이트 후에 인증서가 사라졌어요']
+
+	columns = ['max_batch_size', 'max_wait_ms', 'requests', 'rejected', 'throughput', 'p50_ms', 'p99_ms', 'mean_batch']
+	print(''.join('{:>15}'.format(column) for column in columns))
+	for max_batch_size in args.batch_sizes:
+		for wait_ms in args.wait_ms:
+			result = asyncio.run(run_load(predict_fn, texts, max_batch_size, wait_ms / 1000, args.rate, args.duration, args.max_queue_size))
+			print(''.join('{:>15.2f}'.format(result[column]) if isinstance(result[column], float) else '{:>15}'.format(result[column]) for column in columns))
+
+if __name__ == '__main__':
+	main()
@@ -1,8 +1,7 @@
-import pandas as pd
-
 class DataMaker:
 	@staticmethod
 	def make_shinhan_issue_class_data(file_path, test_index_file_path):
+		import pandas as pd
 		data_frame = pd.read_excel(file_path)
 
 		f = open(test_index_file_path, 'r')
@@ -55,6 +54,7 @@ class DataMaker:
 	
 	@staticmethod
 	def make_issue_class_data_from_crawled(file_path):
+		import pandas as pd
 		data_frame = pd.read_excel(file_path)
 		
 		data = []
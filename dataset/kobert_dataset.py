@@ -0,0 +1,50 @@
+import gluonnlp as nlp
+import numpy as np
+import torch
+from torch.utils.data import Dataset
+from ..sequence_length import make_windows
+
+class KoBERTDataset(Dataset):
+  # window_stride: None to truncate long sentences, otherwise cut them into windows starting every window_stride tokens
+  def __init__(self, dataset, sent_idx, label_idx, bert_tokenizer, max_len,
+              pad, pair, window_stride=None):
+    # review index of each row (a long review gives several rows in sliding window mode), None when truncating
+    self.sample_index = None if window_stride is None else []
+    self.num_samples = len(dataset)
+
+    if window_stride is None:
+      transform = nlp.data.BERTSentenceTransform(
+          bert_tokenizer, max_seq_length=max_len, pad=pad, pair=pair)
+
+      sentences = [transform([i[sent_idx]]) for i in dataset]
+      labels = [np.int32(i[label_idx]) for i in dataset]
+      self.stack(sentences, labels, max_len)
+      return
+
+    # same output as BERTSentenceTransform (single sentence, padded), one row per window
+    vocab = bert_tokenizer.vocab
+    sentences = []
+    labels = []
+    for sample_index, i in enumerate(dataset):
+      for window in make_windows(bert_tokenizer(i[sent_idx]), max_len - 2, window_stride):
+        token_ids = vocab[[vocab.cls_token] + window + [vocab.sep_token]]
+        valid_length = len(token_ids)
+        token_ids = token_ids + [vocab[vocab.padding_token]] * (max_len - valid_length)
+        sentences.append((np.array(token_ids, dtype='int32'), np.array(valid_length, dtype='int32'), np.zeros(max_len, dtype='int32')))
+        labels.append(np.int32(i[label_idx]))
+        self.sample_index.append(sample_index)
+    self.stack(sentences, labels, max_len)
+
+  # one tensor per field instead of numpy arrays per row: torch shares them with other
+  # processes (e.g. the sweeper workers) through shared memory instead of copying them
+  def stack(self, sentences, labels, max_len):
+    self.token_ids = torch.from_numpy(np.array([s[0] for s in sentences], dtype='int32').reshape(len(sentences), max_len))
+    self.valid_length = torch.from_numpy(np.array([s[1] for s in sentences], dtype='int32'))
+    self.segment_ids = torch.from_numpy(np.array([s[2] for s in sentences], dtype='int32').reshape(len(sentences), max_len))
+    self.labels = torch.from_numpy(np.array(labels, dtype='int32'))
+
+  def __getitem__(self, i):
+    return (self.token_ids[i], self.valid_length[i], self.segment_ids[i], self.labels[i])
+
+  def __len__(self):
+    return (len(self.labels))
@@ -0,0 +1,69 @@
+import torch
+from torch.utils.data import Dataset
+from ..sequence_length import make_windows
+
+class KoElectraClassificationDataset(Dataset):
+	def __init__(self,
+							device = None,
+							tokenizer = None,
+							zipped_data = None,
+							max_seq_len = None, # KoBERT max_length
+							window_stride = None, # None: truncate long reviews, otherwise cut them into windows starting every window_stride tokens
+							):
+
+		self.device = device
+		self.tokenizer = tokenizer
+		# review index of each row (a long review gives several rows in sliding window mode), None when truncating
+		self.sample_index = None if window_stride is None else []
+		self.num_samples = len(zipped_data)
+
+		rows = []
+		for sample_index, zd in enumerate(zipped_data):
+			if window_stride is None:
+				index_of_words = self.tokenizer.encode(zd[0])
+
+				if len(index_of_words) > max_seq_len:
+					# keep the final [SEP]
+					index_of_words = index_of_words[:max_seq_len - 1] + index_of_words[-1:]
+				windows = [index_of_words]
+			else:
+				index_of_words = self.tokenizer.encode(zd[0], add_special_tokens=False)
+				windows = [[self.tokenizer.cls_token_id] + window + [self.tokenizer.sep_token_id] for window in make_windows(index_of_words, max_seq_len - 2, window_stride)]
+
+			for index_of_words in windows:
+				rows.append(self.make_row(index_of_words, zd[1], max_seq_len))
+				if self.sample_index is not None:
+					self.sample_index.append(sample_index)
+
+		# one (rows, max_seq_len) tensor per field instead of small tensors per row,
+		# so that sharing the dataset with other processes needs a few shared memory files, not 4 per review
+		self.input_ids = torch.tensor([row[0] for row in rows], dtype=torch.long).reshape(len(rows), max_seq_len).to(self.device)
+		self.token_type_ids = torch.tensor([row[1] for row in rows], dtype=torch.long).reshape(len(rows), max_seq_len).to(self.device)
+		self.attention_mask = torch.tensor([row[2] for row in rows], dtype=torch.long).reshape(len(rows), max_seq_len).to(self.device)
+		self.labels = torch.tensor([row[3] for row in rows], dtype=torch.long).to(self.device)
+
+	def make_row(self, index_of_words, label, max_seq_len):
+		token_type_ids = [0] * len(index_of_words)
+		attention_mask = [1] * len(index_of_words)
+
+		# Padding Length
+		padding_length = max_seq_len - len(index_of_words)
+
+		# Zero Padding
+		index_of_words = index_of_words + [0] * padding_length
+		token_type_ids += [0] * padding_length
+		attention_mask += [0] * padding_length
+
+		# Label
+		label = int(label)
+		return index_of_words, token_type_ids, attention_mask, label
+
+	def __len__(self):
+		return len(self.labels)
+	def __getitem__(self,index):
+		return {
+			'input_ids': self.input_ids[index],
+			'token_type_ids': self.token_type_ids[index],
+			'attention_mask': self.attention_mask[index],
+			'labels': self.labels[index]
+		}
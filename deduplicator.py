@@ -0,0 +1,140 @@
+import re
+import numpy as np
+
+# minhash permutations are (a * x + b) mod MERSENNE_PRIME, small enough that a * x fits in uint64
+MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+
+class MinHashDeduplicator:
+	# threshold: estimated Jaccard similarity (of character shingles) above which two reviews are the same
+	# num_perm: length of the MinHash signature, longer is more accurate but slower
+	# shingle_size: number of characters of one shingle
+	def __init__(self, threshold = 0.8, num_perm = 128, shingle_size = 3, seed = 1):
+		self.threshold = threshold
+		self.num_perm = num_perm
+		self.shingle_size = shingle_size
+		self.num_bands, self.band_rows = choose_bands(threshold, num_perm)
+
+		random_state = np.random.RandomState(seed)
+		self.perm_a = random_state.randint(1, int(MERSENNE_PRIME), size = num_perm).astype(np.uint64)
+		self.perm_b = random_state.randint(0, int(MERSENNE_PRIME), size = num_perm).astype(np.uint64)
+
+		self.reset()
+
+	def reset(self):
+		# one entry per group of near-duplicates, the first review of a group represents it
+		self.representatives = []
+		self.representative_labels = []
+		self.weights = []
+		self.signatures = []
+		# LSH buckets: (band index, band of the signature) -> group indices
+		self.buckets = {}
+		# (normalized text, label) -> group index, exact copies skip hashing
+		self.exact_groups = {}
+
+	def signature(self, text):
+		shingle_hashes = hash_shingles(normalize(text), self.shingle_size)
+		# (num_perm, num_shingles) permuted hashes, the minimum of each row is the signature
+		permuted = (self.perm_a[:, None] * shingle_hashes[None, :] + self.perm_b[:, None]) % MERSENNE_PRIME
+		return permuted.min(axis = 1).astype(np.uint32)
+
+	def band_keys(self, signature):
+		return [(band_index, signature[band_index * self.band_rows:(band_index + 1) * self.band_rows].tobytes()) for band_index in range(self.num_bands)]
+
+	# return the group index of the most similar near-duplicate, or -1 if there is none
+	def query(self, text, label = None, signature = None):
+		if signature is None:
+			signature = self.signature(text)
+		candidates = set()
+		for key in self.band_keys(signature):
+			candidates.update(self.buckets.get(key, ()))
+		if label is not None:
+			# reviews with different labels are never merged
+			candidates = [group for group in candidates if self.representative_labels[group] == label]
+		if not candidates:
+			return -1
+
+		candidates = sorted(candidates)
+		similarity = (np.stack([self.signatures[group] for group in candidates]) == signature).mean(axis = 1)
+		best = similarity.argmax()
+		if similarity[best] < self.threshold:
+			return -1
+		return candidates[best]
+
+	# add one review (streaming), return the index of the group it joined
+	def add(self, text, label = None, weight = 1):
+		exact_key = (normalize(text), label)
+		group = self.exact_groups.get(exact_key, -1)
+		if group < 0:
+			signature = self.signature(text)
+			group = self.query(text, label, signature)
+		if group >= 0:
+			self.exact_groups[exact_key] = group
+			self.weights[group] += weight
+			return group
+
+		group = len(self.representatives)
+		self.representatives.append(text)
+		self.representative_labels.append(label)
+		self.weights.append(weight)
+		self.signatures.append(signature)
+		for key in self.band_keys(signature):
+			self.buckets.setdefault(key, []).append(group)
+		self.exact_groups[exact_key] = group
+		return group
+
+	# return representative data, label and multiplicity weight of each group of near-duplicates
+	def deduplicate(self, data, label = None):
+		self.reset()
+		for index, text in enumerate(data):
+			self.add(text, None if label is None else label[index])
+		if label is None:
+			return list(self.representatives), None, list(self.weights)
+		return list(self.representatives), list(self.representative_labels), list(self.weights)
+
+	# drop the rows that are near-duplicates of anything already added (e.g. train rows that leak into the test data)
+	def exclude(self, data, label = None, weight = None):
+		keep = [index for index, text in enumerate(data) if self.query(text) < 0]
+		data = [data[index] for index in keep]
+		if label is not None:
+			label = [label[index] for index in keep]
+		if weight is not None:
+			weight = [weight[index] for index in keep]
+		return data, label, weight
+
+def normalize(text):
+	if not isinstance(text, str):
+		text = str(text)
+	return re.sub(r'\s+', ' ', text).strip().lower()
+
+# hash every character n-gram of the text at once, as uint64 values below MERSENNE_PRIME
+def hash_shingles(text, shingle_size):
+	code_points = np.frombuffer(text.encode('utf-32-le'), dtype = np.uint32).astype(np.uint64)
+	if len(code_points) == 0:
+		return np.zeros(1, dtype = np.uint64)
+	shingle_size = min(shingle_size, len(code_points))
+	num_shingles = len(code_points) - shingle_size + 1
+
+	hashes = np.zeros(num_shingles, dtype = np.uint64)
+	for offset in range(shingle_size):
+		# code points are below 2^21, so (hash * 1000003 + code point) never overflows before the mod
+		hashes = (hashes * np.uint64(1000003) + code_points[offset:offset + num_shingles]) % MERSENNE_PRIME
+	return np.unique(hashes)
+
+# pick (bands, rows) for recall: the LSH collision curve (1 / bands) ^ (1 / rows) should be at or below the
+# threshold, so that pairs just above it almost always become candidates (candidates are checked with the
+# full signature anyway), and as close to it as possible to keep the number of candidates small
+def choose_bands(threshold, num_perm):
+	best = None
+	for rows in range(1, num_perm + 1):
+		if num_perm % rows != 0:
+			continue
+		bands = num_perm // rows
+		curve_threshold = (1.0 / bands) ** (1.0 / rows)
+		if curve_threshold > threshold:
+			continue
+		if best is None or curve_threshold > best[0]:
+			best = (curve_threshold, bands, rows)
+	if best is None:
+		# threshold below 1 / num_perm: every band is a single row
+		return num_perm, 1
+	return best[1], best[2]
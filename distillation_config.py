@@ -0,0 +1,20 @@
+class DistillationConfig:
+  def __init__(
+    self,
+    num_student_layers,   # 학생 모델의 transformer layer 수 (teacher layer에서 골라서 초기화)
+    n_epoch,       # Num of Epoch
+    batch_size,      # 배치 사이즈
+    learning_rate,
+    temperature = 2.0,   # soft target을 만들 때 logit을 나누는 값
+    alpha = 0.5,   # soft target loss 비율 (1 - alpha 만큼 label loss)
+    warmup_ratio = 0.1,
+    max_grad_norm = 1,
+	):	
+    self.num_student_layers = num_student_layers
+    self.n_epoch = n_epoch
+    self.batch_size = batch_size
+    self.learning_rate = learning_rate
+    self.temperature = temperature
+    self.alpha = alpha
+    self.warmup_ratio = warmup_ratio
+    self.max_grad_norm = max_grad_norm
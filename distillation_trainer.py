@@ -0,0 +1,215 @@
+import copy
+import time
+from .training_engine import TrainingEngine, make_trainer, set_num_threads
+
+class DistillationTrainer:
+	# performance_config: PerformanceConfig (compile, fused optimizer, threads), Default: PerformanceConfig()
+	def __init__(self, performance_config = None):
+		self.performance_config = performance_config
+
+	def train(self, teacher, train_data, train_label, test_data, test_label, config, distillation_config, device, model_output_path, tokenizer = None):
+		# teacher: trained KoBERTClassifier or KoElectraClassifier
+		# config: KoBERTConfig or KoELECTRAConfig the teacher was trained with (used for tokenizing)
+		# tokenizer: tokenizer of the teacher (Default: loaded from the pretrained model)
+		import torch
+		trainer = make_trainer(config, self.performance_config)
+		set_num_threads(trainer.performance_config)
+		if tokenizer is None:
+			_, tokenizer = trainer.load_pretrained()
+		train_dataset = trainer.make_dataset(train_data, train_label, tokenizer, config)
+		test_dataset = trainer.make_dataset(test_data, test_label, tokenizer, config)
+
+		teacher.to(device)
+		student = make_student(teacher, distillation_config.num_student_layers)
+
+		# teacher logits never change, so compute them once instead of every epoch
+		print("Caching teacher logits...")
+		# one row per train dataset row (per window in sliding window mode), looked up by IndexedDataset
+		train_teacher_logits, _, _ = predict_logits(teacher, train_dataset, distillation_config.batch_size, device, trainer.forward)
+		# teacher is not needed on the device any more
+		teacher.to(torch.device("cpu"))
+
+		# the shared training loop, with the hyperparameters of the distillation
+		train_config = copy.copy(config)
+		train_config.batch_size = distillation_config.batch_size
+		train_config.learning_rate = distillation_config.learning_rate
+		train_config.warmup_ratio = distillation_config.warmup_ratio
+		train_config.max_grad_norm = distillation_config.max_grad_norm
+		engine = DistillationEngine(trainer, trainer.performance_config, distillation_config, train_teacher_logits)
+		history = engine.fit(student, train_dataset, test_dataset, train_config, device)
+
+		# time the trained student and the teacher with the same eager predict_logits call (no compile
+		# or trace warm-up, no loss, same window pooling) so that the speedup compares the models only
+		teacher.to(device)
+		_, teacher_test_acc, teacher_test_time = predict_logits(teacher, test_dataset, distillation_config.batch_size, device, trainer.forward, test_label, config.window_pooling)
+		teacher.to(torch.device("cpu"))
+		_, student_test_acc, student_test_time = predict_logits(student, test_dataset, distillation_config.batch_size, device, trainer.forward, test_label, config.window_pooling)
+		speedup = teacher_test_time / student_test_time
+		print("student acc {} (teacher {}) / inference time {} (teacher {}, {:.2f}x faster)\n".format(student_test_acc, teacher_test_acc, student_test_time, teacher_test_time, speedup))
+
+		save_student(student, model_output_path)
+		# Print the result
+		print("RESULT - copy and paste this to the report")
+		for epoch_index in range(distillation_config.n_epoch):
+			print('epoch ', epoch_index, end='\t')
+			print('')
+		for i in history['loss']:
+			print(i, end='\t')
+			print('')
+		for i in history['train_acc']:
+			print(i, end='\t')
+			print('')
+		for i in history['test_acc']:
+			print(i, end='\t')
+			print('')
+		for i in history['train_time']:
+			print(i, end='\t')
+			print('')
+		print(speedup)
+
+		return student
+
+	# rebuild a student saved by train(), no pretrained weights are downloaded
+	@staticmethod
+	def load_student(model_path, device):
+		import torch
+		from transformers import BertConfig, BertModel, ElectraConfig
+		from .model.kobert_classifier import KoBERTClassifier
+		from .model.koelectra_classifier import KoElectraClassifier
+		checkpoint = torch.load(model_path, map_location=device)
+		if checkpoint['model_type'] == 'kobert':
+			bert = BertModel(BertConfig.from_dict(checkpoint['backbone_config']))
+			student = KoBERTClassifier(bert, hidden_size=bert.config.hidden_size, num_classes=checkpoint['num_labels'], dr_rate=checkpoint['dr_rate'])
+		else:
+			student = KoElectraClassifier(ElectraConfig.from_dict(checkpoint['backbone_config']), num_labels=checkpoint['num_labels'])
+		student.load_state_dict(checkpoint['model_state_dict'])
+		student.to(device)
+		return student
+
+class DistillationEngine(TrainingEngine):
+	# trains the student on the soft targets of the cached teacher logits and on the labels
+	def __init__(self, adapter, performance_config, distillation_config, train_teacher_logits):
+		super().__init__(adapter, performance_config)
+		self.distillation_config = distillation_config
+		self.train_teacher_logits = train_teacher_logits
+
+	def get_num_epochs(self, config):
+		return self.distillation_config.n_epoch
+
+	def make_train_dataset(self, train_dataset):
+		return IndexedDataset(train_dataset)
+
+	def split_batch(self, batch):
+		sample_index, data = batch
+		return data, sample_index
+
+	def loss(self, logit, label, sample_index, device):
+		from torch.nn import functional as F
+		temperature = self.distillation_config.temperature
+		alpha = self.distillation_config.alpha
+		teacher_logit = self.train_teacher_logits[sample_index].to(device)
+		soft_loss = F.kl_div(
+			F.log_softmax(logit / temperature, dim=1),
+			F.softmax(teacher_logit / temperature, dim=1),
+			reduction='batchmean',
+		) * temperature * temperature
+		hard_loss = F.cross_entropy(logit, label)
+		return alpha * soft_loss + (1 - alpha) * hard_loss
+
+class IndexedDataset:
+	# returns the sample index with the sample, used to look up the cached teacher logits
+	def __init__(self, dataset):
+		self.dataset = dataset
+
+	def __len__(self):
+		return len(self.dataset)
+
+	def __getitem__(self, index):
+		return index, self.dataset[index]
+
+# pick num_student_layers layers spread evenly over the teacher, always keeping the last one
+def select_teacher_layers(num_teacher_layers, num_student_layers):
+	if num_student_layers < 1 or num_student_layers > num_teacher_layers:
+		raise ValueError("num_student_layers should be between 1 and {}, not {}".format(num_teacher_layers, num_student_layers))
+	return [round((i + 1) * num_teacher_layers / num_student_layers) - 1 for i in range(num_student_layers)]
+
+def make_student(teacher, num_student_layers):
+	from transformers import BertModel
+	from .model.kobert_classifier import KoBERTClassifier
+	from .model.koelectra_classifier import KoElectraClassifier
+	if isinstance(teacher, KoBERTClassifier):
+		teacher_backbone = teacher.bert
+	elif isinstance(teacher, KoElectraClassifier):
+		teacher_backbone = teacher.electra
+	else:
+		raise TypeError("teacher should be KoBERTClassifier or KoElectraClassifier, not {}".format(type(teacher).__name__))
+
+	layer_indices = select_teacher_layers(teacher_backbone.config.num_hidden_layers, num_student_layers)
+	student_config = copy.deepcopy(teacher_backbone.config)
+	student_config.num_hidden_layers = num_student_layers
+
+	if isinstance(teacher, KoBERTClassifier):
+		student = KoBERTClassifier(BertModel(student_config), hidden_size=student_config.hidden_size, num_classes=teacher.classifier.out_features, dr_rate=teacher.dr_rate)
+	else:
+		student = KoElectraClassifier(student_config, num_labels=teacher.num_labels)
+
+	# everything except the dropped encoder layers starts from the teacher weights
+	student_state = student.state_dict()
+	for name, value in teacher.state_dict().items():
+		student_name = rename_teacher_layer(name, layer_indices)
+		if student_name is not None:
+			student_state[student_name] = value.clone()
+	student.load_state_dict(student_state)
+	return student
+
+def rename_teacher_layer(name, layer_indices):
+	marker = '.encoder.layer.'
+	if marker not in name:
+		return name
+	prefix, rest = name.split(marker, 1)
+	teacher_index, suffix = rest.split('.', 1)
+	if int(teacher_index) not in layer_indices:
+		return None
+	return '{}{}{}.{}'.format(prefix, marker, layer_indices.index(int(teacher_index)), suffix)
+
+def save_student(student, model_output_path):
+	import torch
+	from .model.kobert_classifier import KoBERTClassifier
+	if isinstance(student, KoBERTClassifier):
+		model_type = 'kobert'
+		backbone_config = student.bert.config
+		num_labels = student.classifier.out_features
+	else:
+		model_type = 'koelectra'
+		backbone_config = student.electra.config
+		num_labels = student.num_labels
+	torch.save({
+		'model_type': model_type,
+		'backbone_config': backbone_config.to_dict(),
+		'num_labels': num_labels,
+		'dr_rate': getattr(student, 'dr_rate', None),
+		'model_state_dict': student.state_dict(),
+	}, model_output_path)
+
+# logits of the whole dataset in order, with accuracy and time when the labels are given
+# with the labels, windows of the same review are pooled into one row per review
+def predict_logits(model, dataset, batch_size, device, forward, label = None, window_pooling = 'mean'):
+	import torch
+	from torch.utils.data import DataLoader
+	from .sequence_length import pool_window_logits
+	loader = DataLoader(dataset, batch_size=batch_size, shuffle=False)
+	model.eval()
+	logits = []
+	start_time = time.time()
+	with torch.no_grad():
+		for data in loader:
+			logit, _ = forward(model, data, device)
+			logits.append(logit.cpu())
+	end_time = time.time()
+	logits = torch.cat(logits)
+	acc = None
+	if label is not None:
+		if dataset.sample_index is not None:
+			logits = pool_window_logits(logits, dataset.sample_index, dataset.num_samples, window_pooling)
+		acc = (logits.argmax(1) == torch.tensor(label).long()).float().mean().item()
+	return logits, acc, end_time - start_time
@@ -0,0 +1,151 @@
+import copy
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from .kobert_config import KoBERTConfig
+from .koelectra_config import KoELECTRAConfig
+from .performance_config import PerformanceConfig
+from .training_engine import make_trainer
+
+# config attribute of the sequence length, which decides how the data is tokenized
+SEQ_LEN_ATTRIBUTE = {
+	KoBERTConfig: 'max_len',
+	KoELECTRAConfig: 'max_seq_len',
+}
+
+# state shared by every trial of a worker process (set once by _init_worker)
+_worker_state = None
+
+class HyperparameterSweeper:
+	# performance_config: PerformanceConfig used by every trial, Default: PerformanceConfig()
+	def __init__(self, performance_config = None):
+		self.performance_config = performance_config
+
+	def sweep(self, train_data, train_label, test_data, test_label, base_config, param_grid, device, num_workers = 1, threads_per_worker = None, seed = 42):
+		# base_config: KoBERTConfig or KoELECTRAConfig used for every value not in param_grid
+		# param_grid: (dict type) config attribute -> list of values to try, e.g. {'learning_rate': [5e-5, 3e-5], 'batch_size': [32, 64]}
+		# num_workers: number of trials trained at the same time (each in its own process)
+		# threads_per_worker: torch intra-op threads of each trial (Default: performance_config.num_threads, otherwise cpu count / num_workers)
+		# seed: random seed set at the start of every trial, so that trials differ only in their hyperparameters
+		import pandas as pd
+		import torch
+		import torch.multiprocessing as mp
+		performance_config = copy.copy(self.performance_config) if self.performance_config is not None else PerformanceConfig()
+		if threads_per_worker is None:
+			threads_per_worker = performance_config.num_threads
+		elif performance_config.num_threads is not None and performance_config.num_threads != threads_per_worker:
+			raise ValueError("threads_per_worker ({}) and performance_config.num_threads ({}) disagree, give only one of them".format(threads_per_worker, performance_config.num_threads))
+		if threads_per_worker is None:
+			threads_per_worker = max(1, (os.cpu_count() or 1) // max(1, num_workers))
+		# every trial trains with threads_per_worker threads (TrainingEngine sets them from the performance config)
+		performance_config.num_threads = threads_per_worker
+		trainer = make_trainer(base_config, performance_config)
+		configs = make_grid_configs(base_config, param_grid)
+
+		# the pretrained weights and the tokenizer are loaded from disk only once for the whole sweep
+		backbone, tokenizer = trainer.load_pretrained()
+
+		# tokenize once per distinct sequence length (and window setting), every trial with it reuses the tensors
+		seq_len_attribute = SEQ_LEN_ATTRIBUTE[type(base_config)]
+		datasets = {}
+		for config in configs:
+			key = dataset_key(config, seq_len_attribute)
+			if key not in datasets:
+				datasets[key] = (
+					trainer.make_dataset(train_data, train_label, tokenizer, config),
+					trainer.make_dataset(test_data, test_label, tokenizer, config),
+				)
+
+		results = []
+		if num_workers <= 1:
+			state = make_worker_state(trainer, backbone, datasets, seq_len_attribute)
+			# trials run in this process, give the caller its thread count back afterwards
+			num_threads = torch.get_num_threads()
+			try:
+				for config in configs:
+					results.append(run_trial(state, config, device, seed))
+			finally:
+				torch.set_num_threads(num_threads)
+		else:
+			# parameters and the tokenized tensors (a few stacked tensors per dataset) go through
+			# shared memory instead of being copied into every worker
+			backbone.share_memory()
+			executor = ProcessPoolExecutor(
+				max_workers = num_workers,
+				mp_context = mp.get_context('spawn'),
+				initializer = _init_worker,
+				initargs = (trainer, backbone, datasets, seq_len_attribute),
+			)
+			with executor:
+				futures = [executor.submit(_run_trial_in_worker, config, device, seed) for config in configs]
+				for future in futures:
+					results.append(future.result())
+
+		for index, result in enumerate(results):
+			for name in param_grid:
+				result[name] = getattr(configs[index], name)
+
+		# one row per trial, best trial first
+		result_table = pd.DataFrame(results, columns = list(param_grid) + ['seed', 'best_test_acc', 'final_test_acc', 'final_train_acc', 'final_loss', 'train_time'])
+		return result_table.sort_values('best_test_acc', ascending = False).reset_index(drop = True)
+
+def make_grid_configs(base_config, param_grid):
+	for name in param_grid:
+		if not hasattr(base_config, name):
+			raise ValueError("{} has no attribute '{}'".format(type(base_config).__name__, name))
+
+	configs = []
+	names = list(param_grid)
+	for values in itertools.product(*[param_grid[name] for name in names]):
+		config = copy.copy(base_config)
+		for name, value in zip(names, values):
+			setattr(config, name, value)
+		configs.append(config)
+	return configs
+
+def dataset_key(config, seq_len_attribute):
+	return getattr(config, seq_len_attribute), config.long_text_mode, config.window_stride
+
+def make_worker_state(trainer, backbone, datasets, seq_len_attribute):
+	return {
+		'trainer': trainer,
+		'backbone': backbone,
+		'datasets': datasets,
+		'seq_len_attribute': seq_len_attribute,
+	}
+
+def run_trial(state, config, device, seed):
+	# same head initialization, dropout masks and shuffle order in every trial
+	set_seed(seed)
+	trainer = state['trainer']
+	train_dataset, test_dataset = state['datasets'][dataset_key(config, state['seq_len_attribute'])]
+
+	# every trial fine-tunes its own copy, the loaded backbone stays untouched
+	classification_model = trainer.build_model(copy.deepcopy(state['backbone']), config)
+
+	start_time = time.time()
+	history = trainer.fit(classification_model, train_dataset, test_dataset, config, device, verbose = False)
+	return {
+		'seed': seed,
+		'best_test_acc': max(history['test_acc']),
+		'final_test_acc': history['test_acc'][-1],
+		'final_train_acc': history['train_acc'][-1],
+		'final_loss': history['loss'][-1],
+		'train_time': time.time() - start_time,
+	}
+
+def _init_worker(trainer, backbone, datasets, seq_len_attribute):
+	global _worker_state
+	_worker_state = make_worker_state(trainer, backbone, datasets, seq_len_attribute)
+
+def _run_trial_in_worker(config, device, seed):
+	return run_trial(_worker_state, config, device, seed)
+
+def set_seed(seed):
+	import numpy as np
+	import torch
+	random.seed(seed)
+	np.random.seed(seed)
+	torch.manual_seed(seed)
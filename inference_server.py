@@ -0,0 +1,116 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+class ServerOverloadedError(Exception):
+	pass
+
+class MicroBatchingServer:
+	# predict_fn: takes a list of texts and returns one result per text, e.g. ClassifierPredictor(...).predict
+	# max_batch_size: the most requests given to predict_fn at once
+	# max_wait_time: seconds a request waits for others to join its batch
+	# max_queue_size: waiting requests allowed before classify() blocks (or fails when block = False)
+	def __init__(self, predict_fn, max_batch_size = 32, max_wait_time = 0.005, max_queue_size = 1024):
+		self.predict_fn = predict_fn
+		self.max_batch_size = max_batch_size
+		self.max_wait_time = max_wait_time
+		self.max_queue_size = max_queue_size
+		self.batch_sizes = [] # size of every batch run, for monitoring
+		self.queue = None
+		self.worker = None
+		self.stopping = False
+		self.executor = None
+
+	async def __aenter__(self):
+		await self.start()
+		return self
+
+	async def __aexit__(self, exc_type, exc, tb):
+		await self.stop()
+
+	async def start(self):
+		self.queue = asyncio.Queue(maxsize = self.max_queue_size)
+		# a single thread runs the model so that batches never compete for it
+		self.executor = ThreadPoolExecutor(max_workers = 1)
+		self.stopping = False
+		self.worker = asyncio.create_task(self.batching_loop())
+
+	async def stop(self):
+		worker = self.worker
+		if worker is None:
+			# never started or already stopped
+			return
+		if not self.stopping:
+			# requests already queued are still answered before the loop ends, new ones are refused
+			self.stopping = True
+			await self.queue.put(None)
+		# a stop() that is already running is waited for
+		await worker
+		if self.worker is worker:
+			self.executor.shutdown()
+			self.worker = None
+
+	async def classify(self, text, block = True):
+		worker = self.worker
+		if worker is None or self.stopping:
+			raise RuntimeError("The server is not running. Call start() first")
+		future = asyncio.get_running_loop().create_future()
+		if block:
+			# backpressure: the caller waits here while the queue is full
+			await self.queue.put((text, future))
+			if worker.done():
+				# the server stopped while this request waited for room in the queue
+				raise RuntimeError("The server stopped before the request was run")
+		else:
+			try:
+				self.queue.put_nowait((text, future))
+			except asyncio.QueueFull:
+				raise ServerOverloadedError("{} requests are already waiting".format(self.max_queue_size))
+		return await future
+
+	async def batching_loop(self):
+		loop = asyncio.get_running_loop()
+		stopping = False
+		while not stopping:
+			request = await self.queue.get()
+			if request is None:
+				break
+			batch = [request]
+			deadline = loop.time() + self.max_wait_time
+			while len(batch) < self.max_batch_size:
+				timeout = deadline - loop.time()
+				try:
+					if self.queue.empty() and timeout > 0:
+						request = await asyncio.wait_for(self.queue.get(), timeout)
+					else:
+						request = self.queue.get_nowait()
+				except (asyncio.TimeoutError, asyncio.QueueEmpty):
+					break
+				if request is None:
+					stopping = True
+					break
+				batch.append(request)
+
+			await self.run_batch(loop, batch)
+
+		# requests that were queued after the stop are never run
+		while not self.queue.empty():
+			request = self.queue.get_nowait()
+			if request is not None and not request[1].done():
+				request[1].set_exception(RuntimeError("The server stopped before the request was run"))
+
+	async def run_batch(self, loop, batch):
+		texts = [text for text, _ in batch]
+		self.batch_sizes.append(len(texts))
+		try:
+			results = list(await loop.run_in_executor(self.executor, self.predict_fn, texts))
+			if len(results) != len(texts):
+				raise ValueError("predict_fn returned {} results for {} texts".format(len(results), len(texts)))
+		except Exception as e:
+			for _, future in batch:
+				if not future.done():
+					future.set_exception(e)
+			return
+		for (_, future), result in zip(batch, results):
+			# the caller may have been cancelled while waiting
+			if not future.done():
+				future.set_result(result)
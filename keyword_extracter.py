@@ -1,17 +1,10 @@
 from collections import defaultdict
-from numpy import dot
-from numpy.linalg import norm
-import numpy as np
-#import torch
-from tqdm import notebook
-import mecab
-from sklearn.feature_extraction.text import TfidfVectorizer
+from .progress import progress_bar
 
 class KeywordExtracter:
   def __init__(self):
-    mecab_ = mecab.MeCab()
-    # POS tagger
-    self.pos = mecab_.pos
+    # POS tagger, created by pos() on first use
+    self.mecab = None
     # self.corpus_list: contains words (that can be keywords) for each reviews
     # self.keyword_set: every keyword in the data
     # self.keyword_rank: ranking of keyword
@@ -19,6 +12,12 @@ class KeywordExtracter:
     self.keyword_tf = defaultdict(int)  # Term Frequency value of keyword
     self.ngram_keyword = set() # n-grams used as keywords
 
+  def pos(self, sent):
+    if self.mecab is None:
+      import mecab
+      self.mecab = mecab.MeCab()
+    return self.mecab.pos(sent)
+
   def to_surface(self, tok1, tok2, tok3=''):
     if (tok1+tok2+tok3 in self.synonym_dict):
       return self.synonym_dict[tok1+tok2+tok3]
@@ -38,7 +37,7 @@ class KeywordExtracter:
     return short_dict
 
   def analyze(self, data, ngram_threshold = 5, pmi_threshold = 1e-04, rel_threshold = 10, keyword_threshold = 3,
-              use_noun = True, use_predicate = True, synonym_dict = {}, stopword = []): # return self.keyword_rank as List[(keyword as str, frequency as int), ....]
+              use_noun = True, use_predicate = True, synonym_dict = {}, stopword = [], weight = None): # return self.keyword_rank as List[(keyword as str, frequency as int), ....]
     # data: (list type) review to be analyzed
     # ngram_threshold: The minimum value of the number of words to be registered as n-gram
     # pmi_threshold: The minimum value of the PMI value of n-gram to be registered as keyword
@@ -46,12 +45,16 @@ class KeywordExtracter:
     # use_noun: make nouns can be keywords
     # use_predicate: make predicates can be keywords
     # synonym_dict: (dictionary type) convert words to their synonym
+    # weight: (list type) how many times each review occurs, e.g. weights from MinHashDeduplicator.deduplicate (Default: 1 for every review)
 
     if use_noun == False and use_predicate == False:
       print("The value of use_noun and use_predicate cannot be both False. At least one of them should be True")
       return 
     self.corpus_list = []
     self.synonym_dict = synonym_dict
+    if weight is None:
+      weight = [1] * len(data)
+    self.corpus_weight = weight
 
     monogram_list = [] # for monogram
     ngram_list = [] # for bi-gram and tri-gram
@@ -66,9 +69,7 @@ class KeywordExtracter:
     josa_list = ['JKS', 'JKC', 'JKG', 'JKO', 'JKB', 'JKV', 'JKQ', 'JX', 'JC'] # JOSA
 
     print("Collecting n-grams...")
-    for sent in notebook.tqdm(data):
-      monogram_list.append([])
-      ngram_list.append([])
+    for sent in progress_bar(data):
       pos_sent = self.pos(sent)
       temp_corpus = []
       ngram_corpus = []
@@ -98,12 +99,12 @@ class KeywordExtracter:
     # 정리된 monogram과 n-gram 내에서 각각의 빈도값을 추려본다
     monogram_counter = defaultdict(int)
     ngram_counter = defaultdict(int)
-    for sent in monogram_list:
+    for sent, w in zip(monogram_list, weight):
       for monogram in sent:
-        monogram_counter[monogram] += 1
-    for sent in ngram_list:
+        monogram_counter[monogram] += w
+    for sent, w in zip(ngram_list, weight):
       for ngram in sent:
-        ngram_counter[ngram] += 1
+        ngram_counter[ngram] += w
 
     # PMI: (#ngram - threhold)/∏#monogram임을 이용하여 PMI 값을 구함
     ngram_score = defaultdict(float)
@@ -114,7 +115,7 @@ class KeywordExtracter:
       else:
         ngram_score[key] = float( (ngram_counter[key] - ngram_threshold) / (monogram_counter[key[0]] * monogram_counter[key[1]] * monogram_counter[key[2]]) )
     print("Get n-gram keyword by PMI")
-    for sent in notebook.tqdm(data):
+    for sent, w in zip(progress_bar(data), weight):
       pos_sent = self.pos(sent)
       temp_corpus = []
       for i, word in enumerate(pos_sent):
@@ -128,7 +129,7 @@ class KeywordExtracter:
                 temp_corpus.append(bigram)
                 self.keyword_set.add(bigram)
                 self.ngram_keyword.add(bigram)
-                self.keyword_tf[bigram] += 1
+                self.keyword_tf[bigram] += w
                 i+=1
                 continue
               if trigram_score > bigram_score and trigram_score > pmi_threshold:
@@ -136,7 +137,7 @@ class KeywordExtracter:
                 temp_corpus.append(trigram)
                 self.keyword_set.add(trigram)
                 self.ngram_keyword.add(trigram)
-                self.keyword_tf[trigram] += 1
+                self.keyword_tf[trigram] += w
                 i+=2
                 continue
             else:
@@ -145,23 +146,23 @@ class KeywordExtracter:
                 temp_corpus.append(bigram)
                 self.keyword_set.add(bigram)
                 self.ngram_keyword.add(bigram)
-                self.keyword_tf[bigram] += 1
+                self.keyword_tf[bigram] += w
                 i+=1
                 continue
           if word[0] in synonym_dict:
             temp_corpus.append(synonym_dict[word[0]])
             self.keyword_set.add(synonym_dict[word[0]])
-            self.keyword_tf[synonym_dict[word[0]]] += 1
+            self.keyword_tf[synonym_dict[word[0]]] += w
           else:
             temp_corpus.append(word[0])
             self.keyword_set.add(word[0])
-            self.keyword_tf[word[0]] += 1
+            self.keyword_tf[word[0]] += w
           
       self.corpus_list.append(temp_corpus)
     
-    for rev in self.corpus_list:
+    for rev, w in zip(self.corpus_list, weight):
       for term in rev:
-        self.keyword_tf[term] += 1
+        self.keyword_tf[term] += w
     
     for rev in self.corpus_list:
       for term in rev:
@@ -172,6 +173,7 @@ class KeywordExtracter:
           rev.remove(term)
 
     print("TF-IDF")
+    from sklearn.feature_extraction.text import TfidfVectorizer
     self.tfidfv = TfidfVectorizer(preprocessor = ' '.join, stop_words = stopword)
     self.tfidf_matrix = self.tfidfv.fit_transform(self.corpus_list).toarray()
     #self.dic_list = []
@@ -179,24 +181,24 @@ class KeywordExtracter:
     self.keyword_rank = {}
     tfidf_voc = sorted(self.tfidfv.vocabulary_.items())
 
-    for i in notebook.tqdm(self.tfidf_matrix):
+    for i, w in zip(progress_bar(self.tfidf_matrix), weight):
       kw = tfidf_voc[i.argmax()][0]
       if kw in self.keyword_rank:
-        self.keyword_rank[kw] += 1
+        self.keyword_rank[kw] += w
       else:
-        self.keyword_rank[kw] = 1
+        self.keyword_rank[kw] = w
 
     self.keyword_rank = sorted(self.keyword_rank.items(), reverse=True, key = lambda item: item[1]) #sorting
     # Extracting related keyword list!
     self.get_related_keyword_list(rel_threshold = rel_threshold) # get related keyword list
     return self.keyword_rank
 
-  def get_related_keyword_list(self, rel_threshold = 10):g
+  def get_related_keyword_list(self, rel_threshold = 10):
     self.related_keyword = {}
     if not self.corpus_list: # if corpus_list is empty
       print("Analyze the data first!")
       return
-    for rev in notebook.tqdm(self.corpus_list):
+    for rev, w in zip(progress_bar(self.corpus_list), self.corpus_weight):
       for term in rev:
         if term not in self.related_keyword:
           self.related_keyword[term] = {}
@@ -206,10 +208,10 @@ class KeywordExtracter:
             continue # avoid duplication problem
           if term2 not in self.related_keyword[term1]:
             self.related_keyword[term1][term2] = 0
-          self.related_keyword[term1][term2] += 1
+          self.related_keyword[term1][term2] += w
           if term1 not in self.related_keyword[term2]:
             self.related_keyword[term2][term1] = 0
-          self.related_keyword[term2][term1] += 1
+          self.related_keyword[term2][term1] += w
     for term1 in self.related_keyword:
       for term2 in self.related_keyword[term1]:
         self.related_keyword[term1][term2] -= rel_threshold
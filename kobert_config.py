@@ -8,7 +8,10 @@ class KoBERTConfig:
 	num_epochs,
 	max_grad_norm,
 	log_interval,
-	learning_rate
+	learning_rate,
+	long_text_mode = 'truncate', # 'truncate' or 'sliding_window' (max_len 보다 긴 리뷰를 겹치는 window로 나눠서 분류)
+	window_stride = None, # sliding_window: window 시작 간격 token 수 (Default: window 길이의 절반)
+	window_pooling = 'mean', # sliding_window: window logit을 합치는 방법 'mean' or 'max'
 	):	
 			self.num_of_classes = num_of_classes
 			self.max_len = max_len
@@ -18,3 +21,6 @@ class KoBERTConfig:
 			self.max_grad_norm = max_grad_norm
 			self.log_interval = log_interval
 			self.learning_rate =  learning_rate
+			self.long_text_mode = long_text_mode
+			self.window_stride = window_stride
+			self.window_pooling = window_pooling
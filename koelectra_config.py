@@ -7,6 +7,11 @@ class KoELECTRAConfig:
     num_label,
     max_seq_len,
     learning_rate,
+    warmup_ratio = 0.1,   # cosine schedule warmup 비율
+    max_grad_norm = 1,   # gradient clipping
+    long_text_mode = 'truncate',   # 'truncate' or 'sliding_window' (max_seq_len 보다 긴 리뷰를 겹치는 window로 나눠서 분류)
+    window_stride = None,   # sliding_window: window 시작 간격 token 수 (Default: window 길이의 절반)
+    window_pooling = 'mean',   # sliding_window: window logit을 합치는 방법 'mean' or 'max'
 	):	
     self.n_epoch = n_epoch
     self.batch_size = batch_size
@@ -14,3 +19,8 @@ class KoELECTRAConfig:
     self.num_label = num_label
     self.max_seq_len = max_seq_len
     self.learning_rate = learning_rate
+    self.warmup_ratio = warmup_ratio
+    self.max_grad_norm = max_grad_norm
+    self.long_text_mode = long_text_mode
+    self.window_stride = window_stride
+    self.window_pooling = window_pooling
@@ -17,14 +17,15 @@ class KoBERTClassifier(nn.Module):
             self.dropout = nn.Dropout(p=dr_rate)
     
     def gen_attention_mask(self, token_ids, valid_length):
-        attention_mask = torch.zeros_like(token_ids)
-        for i, v in enumerate(valid_length):
-            attention_mask[i][:v] = 1
+        # position < valid_length for the whole batch at once (no python loop, so it can be compiled/traced)
+        positions = torch.arange(token_ids.size(1), device=token_ids.device)
+        attention_mask = positions.unsqueeze(0) < valid_length.to(token_ids.device).unsqueeze(1)
         return attention_mask.float()
 
     def forward(self, token_ids, valid_length, segment_ids):
         attention_mask = self.gen_attention_mask(token_ids, valid_length)
         _, pooler = self.bert(input_ids = token_ids, token_type_ids = segment_ids.long(), attention_mask = attention_mask.float().to(token_ids.device), return_dict=False)
+        out = pooler
         if self.dr_rate:
             out = self.dropout(pooler)
         return self.classifier(out)
\ No newline at end of file
@@ -10,13 +10,19 @@ from transformers import (
 class KoElectraClassifier(ElectraPreTrainedModel):
     def __init__(self, 
                 config,
-                num_labels):
+                num_labels,
+                electra=None): # already loaded ElectraModel to use as the backbone (Default: a new randomly initialized one)
       super().__init__(config)
       self.num_labels = num_labels
-      self.electra = ElectraModel(config)
       self.model = KoElectraClassificationHead(config, num_labels)
 
-      self.init_weights()
+      if electra is None:
+        self.electra = ElectraModel(config)
+        self.init_weights()
+      else:
+        # only the head is new, the given backbone keeps its weights
+        self.electra = electra
+        self.model.apply(self._init_weights)
     def forward(
             self,
             input_ids=None,
@@ -0,0 +1,16 @@
+class PerformanceConfig:
+  def __init__(
+    self,
+    compile_mode = None,   # None, 'torch_compile' (train + eval) or 'torchscript' (traced model for eval)
+    optimizer_implementation = 'auto',   # AdamW kernel: 'auto' (fused on cuda, foreach on cpu), 'fused', 'foreach' or 'for_loop'
+    zero_grad_set_to_none = True,   # free gradients instead of filling them with zeros
+    num_threads = None,   # torch intra-op threads (Default: torch default)
+    num_interop_threads = None,   # torch inter-op threads (Default: torch default)
+	):	
+    if compile_mode not in (None, 'torch_compile', 'torchscript'):
+      raise ValueError("compile_mode should be None, 'torch_compile' or 'torchscript', not {!r}".format(compile_mode))
+    self.compile_mode = compile_mode
+    self.optimizer_implementation = optimizer_implementation
+    self.zero_grad_set_to_none = zero_grad_set_to_none
+    self.num_threads = num_threads
+    self.num_interop_threads = num_interop_threads
@@ -0,0 +1,42 @@
+from .training_engine import make_trainer
+
+class ClassifierPredictor:
+	# model: trained KoBERTClassifier or KoElectraClassifier (a distilled student works the same)
+	# config: KoBERTConfig or KoELECTRAConfig used for tokenizing
+	# batch_size: rows (windows in sliding window mode) run through the model at once
+	def __init__(self, model, tokenizer, config, device, batch_size = 64):
+		self.model = model
+		self.tokenizer = tokenizer
+		self.config = config
+		self.device = device
+		self.batch_size = batch_size
+		self.trainer = make_trainer(config)
+		self.forward = self.trainer.forward
+
+		self.model.to(device)
+		self.model.eval()
+
+	# return class probabilities of each text as a tensor of shape (len(texts), num_labels)
+	def predict_proba(self, texts):
+		import torch
+		from torch.nn import functional as F
+		from torch.utils.data import DataLoader
+		from .sequence_length import pool_window_logits
+		if len(texts) == 0:
+			return torch.zeros(0, 0)
+		dataset = self.trainer.make_dataset(texts, [0] * len(texts), self.tokenizer, self.config)
+		loader = DataLoader(dataset, batch_size=self.batch_size, shuffle=False)
+		with torch.no_grad():
+			logits = []
+			for data in loader:
+				logit, _ = self.forward(self.model, data, self.device)
+				logits.append(logit)
+			logit = torch.cat(logits)
+			if dataset.sample_index is not None:
+				# long texts were split into windows, one row of logits per text again
+				logit = pool_window_logits(logit, dataset.sample_index, dataset.num_samples, self.config.window_pooling)
+		return F.softmax(logit, dim=1).cpu()
+
+	# return the predicted class id of each text
+	def predict(self, texts):
+		return self.predict_proba(texts).argmax(1).tolist()
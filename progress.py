@@ -0,0 +1,5 @@
+# progress bar that picks the notebook widget inside Jupyter/Colab and the text bar in a terminal
+def progress_bar(iterable, **kwargs):
+  # tqdm (and IPython when in a notebook) are only loaded once a bar is actually shown
+  from tqdm.auto import tqdm
+  return tqdm(iterable, **kwargs)
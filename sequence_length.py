@@ -0,0 +1,88 @@
+from .training_engine import make_trainer
+
+# cut the tokens (without [CLS]/[SEP]) into overlapping windows of window_size tokens, starting every stride tokens
+def make_windows(token_ids, window_size, stride):
+	if stride < 1:
+		raise ValueError("window_stride should be at least 1, not {}".format(stride))
+	windows = []
+	start = 0
+	while True:
+		windows.append(token_ids[start:start + window_size])
+		if start + window_size >= len(token_ids):
+			break
+		start += stride
+	return windows
+
+def get_window_stride(config, window_size):
+	if config.window_stride is None:
+		# half of the window overlaps with the next one
+		return max(1, window_size // 2)
+	return config.window_stride
+
+# combine the logits of the windows of each review into one row of logits per review
+def pool_window_logits(logits, sample_index, num_samples, pooling = 'mean'):
+	import torch
+	sample_index = torch.as_tensor(sample_index, device = logits.device)
+	if pooling == 'mean':
+		pooled = torch.zeros(num_samples, logits.size(1), dtype = logits.dtype, device = logits.device)
+		pooled.index_add_(0, sample_index, logits)
+		counts = torch.bincount(sample_index, minlength = num_samples).clamp(min = 1)
+		return pooled / counts.unsqueeze(1).to(logits.dtype)
+	if pooling == 'max':
+		pooled = torch.full((num_samples, logits.size(1)), float('-inf'), dtype = logits.dtype, device = logits.device)
+		return pooled.scatter_reduce(0, sample_index.unsqueeze(1).expand_as(logits), logits, reduce = 'amax')
+	raise ValueError("window_pooling should be 'mean' or 'max', not {!r}".format(pooling))
+
+# one value per review: the first value of each of its windows
+def pool_window_values(values, sample_index, num_samples):
+	import torch
+	sample_index = torch.as_tensor(sample_index, device = values.device)
+	pooled = torch.zeros(num_samples, dtype = values.dtype, device = values.device)
+	return pooled.scatter(0, sample_index, values)
+
+# every window gets the weight of its review, like training without weights uses every window once
+def expand_window_weights(weight, sample_index):
+	return [weight[index] for index in sample_index]
+
+# number of tokens of each review, including [CLS] and [SEP]
+def token_lengths(data, tokenizer, config):
+	trainer = make_trainer(config)
+	return [trainer.count_tokens(text, tokenizer) for text in data]
+
+# how many reviews fit in each max_len, to choose the cutoff from the data instead of guessing
+def token_length_histogram(data, tokenizer, config, max_lens = (16, 32, 48, 64, 96, 128, 192, 256, 384, 512)):
+	import numpy as np
+	import pandas as pd
+	lengths = np.array(token_lengths(data, tokenizer, config))
+	# ratio of the reviews in mask (0 when there is no review)
+	def ratio(mask):
+		return float(mask.mean()) if len(lengths) > 0 else 0.0
+	rows = []
+	previous_max_len = 0
+	for max_len in max_lens:
+		count = int(((lengths > previous_max_len) & (lengths <= max_len)).sum())
+		rows.append({
+			'max_len': max_len,
+			'count': count,
+			'ratio': ratio((lengths > previous_max_len) & (lengths <= max_len)),
+			'cumulative_ratio': ratio(lengths <= max_len),
+		})
+		previous_max_len = max_len
+	rows.append({
+		'max_len': 'longer',
+		'count': int((lengths > previous_max_len).sum()),
+		'ratio': ratio(lengths > previous_max_len),
+		'cumulative_ratio': 1.0 if len(lengths) > 0 else 0.0,
+	})
+	return pd.DataFrame(rows, columns = ['max_len', 'count', 'ratio', 'cumulative_ratio'])
+
+# the smallest max_len that keeps coverage of the reviews whole (longer ones go through sliding windows)
+def suggest_max_len(data, tokenizer, config, coverage = 0.95, max_lens = (16, 32, 48, 64, 96, 128, 192, 256, 384, 512)):
+	import numpy as np
+	lengths = np.array(token_lengths(data, tokenizer, config))
+	if len(lengths) == 0:
+		return max_lens[0]
+	for max_len in max_lens:
+		if (lengths <= max_len).mean() >= coverage:
+			return max_len
+	return max_lens[-1]
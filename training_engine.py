@@ -0,0 +1,219 @@
+import time
+from .confusion_matrix import ConfusionMatrix
+from .performance_config import PerformanceConfig
+from .progress import progress_bar
+
+class TrainerAdapter:
+	# base of the model specific trainers: they only say how to load, build, tokenize and call
+	# their model (load_pretrained, build_model, make_dataset, model_inputs, labels, logits,
+	# get_num_epochs, get_num_labels), the training loop itself is shared in TrainingEngine
+	def __init__(self, performance_config = None):
+		self.performance_config = performance_config if performance_config is not None else PerformanceConfig()
+
+	# batch -> (logits, labels)
+	def forward(self, model, data, device):
+		return self.logits(model(*self.model_inputs(data, device))), self.labels(data, device)
+
+	# run the epoch/eval loop on an already built model and datasets, return the history
+	# train_weight: multiplicity of each train review (e.g. from MinHashDeduplicator), reviews are sampled in proportion to it
+	# (in sliding window mode every window has the weight of its review, as every window is used without weights)
+	def fit(self, classification_model, train_dataset, test_dataset, config, device, verbose=True, train_weight=None):
+		engine = TrainingEngine(self, self.performance_config)
+		return engine.fit(classification_model, train_dataset, test_dataset, config, device, verbose=verbose, train_weight=train_weight)
+
+class TrainingEngine:
+	def __init__(self, adapter, performance_config = None):
+		self.adapter = adapter
+		self.performance_config = performance_config if performance_config is not None else PerformanceConfig()
+
+	# hooks for trainings with another objective than the labels alone (e.g. DistillationEngine)
+	def get_num_epochs(self, config):
+		return self.adapter.get_num_epochs(config)
+
+	# dataset the train loader iterates
+	def make_train_dataset(self, train_dataset):
+		return train_dataset
+
+	# train batch -> (data for the adapter, extra state given to loss)
+	def split_batch(self, batch):
+		return batch, None
+
+	def loss(self, logit, label, batch_state, device):
+		return self.loss_fn(logit, label)
+
+	def fit(self, classification_model, train_dataset, test_dataset, config, device, verbose=True, train_weight=None):
+		import numpy as np
+		import pandas as pd
+		import torch
+		from torch import nn
+		from torch.utils.data import DataLoader, WeightedRandomSampler
+		from transformers.optimization import get_cosine_schedule_with_warmup
+		from .sequence_length import expand_window_weights, pool_window_logits, pool_window_values
+
+		adapter = self.adapter
+		performance_config = self.performance_config
+		device = torch.device(device)
+		num_epochs = self.get_num_epochs(config)
+		set_num_threads(performance_config)
+		classification_model.to(device)
+
+		if train_weight is not None and len(set(train_weight)) <= 1:
+			# equal weights sample like no weights, so they train the same way
+			train_weight = None
+		if train_weight is None:
+			# every row once per epoch, in sliding window mode every window of every review
+			train_loader = DataLoader(self.make_train_dataset(train_dataset), batch_size=config.batch_size, shuffle=True)
+		else:
+			if getattr(train_dataset, 'sample_index', None) is not None:
+				train_weight = expand_window_weights(train_weight, train_dataset.sample_index)
+			sampler = WeightedRandomSampler(train_weight, num_samples=len(train_dataset), replacement=True)
+			train_loader = DataLoader(self.make_train_dataset(train_dataset), batch_size=config.batch_size, sampler=sampler)
+		test_loader = DataLoader(test_dataset, batch_size=config.batch_size, shuffle=False)
+
+		no_decay = ['bias', 'LayerNorm.weight']
+		optimizer_grouped_parameters = [
+			{
+				'params': [p for n, p in classification_model.named_parameters() if not any(nd in n for nd in no_decay)],
+				'weight_decay': 0.01
+			},
+			{
+				'params': [p for n, p in classification_model.named_parameters() if any(nd in n for nd in no_decay)],
+				'weight_decay': 0.0
+			},
+		]
+		optimizer = make_optimizer(optimizer_grouped_parameters, config.learning_rate, performance_config.optimizer_implementation, device)
+		self.loss_fn = nn.CrossEntropyLoss()
+		loss_fn = self.loss_fn
+		t_total = len(train_loader) * num_epochs
+		warmup_step = int(t_total * config.warmup_ratio)
+		scheduler = get_cosine_schedule_with_warmup(optimizer, num_warmup_steps=warmup_step, num_training_steps=t_total)
+
+		train_model = classification_model
+		if performance_config.compile_mode == 'torch_compile':
+			# compiled module shares the parameters, so the optimizer and state_dict are unchanged
+			train_model = torch.compile(classification_model)
+		eval_model = train_model
+		traced_model = None
+
+		# data history for experiments
+		history_loss = []
+		history_train_acc = []
+		history_test_acc = []
+		history_train_time = []
+		history_test_time = []
+
+		for epoch_index in range(num_epochs):
+			if verbose:
+				print("[epoch {}]\n".format(epoch_index + 1))
+
+			train_losses = []
+			train_acc = 0
+			classification_model.train()
+			start_time = time.time()
+			if verbose:
+				print('(train)')
+			for batch_index, batch in enumerate(progress_bar(train_loader) if verbose else train_loader):
+				optimizer.zero_grad(set_to_none=performance_config.zero_grad_set_to_none)
+				data, batch_state = self.split_batch(batch)
+				logit, label = adapter.forward(train_model, data, device)
+				loss = self.loss(logit, label, batch_state, device)
+				train_losses.append(loss.item())
+				loss.backward()
+				if config.max_grad_norm:
+					torch.nn.utils.clip_grad_norm_(classification_model.parameters(), config.max_grad_norm)
+				optimizer.step()
+				scheduler.step()  # Update learning rate schedule
+				train_acc += (logit.argmax(1)==label).sum().item()
+			end_time = time.time()
+			train_loss = np.mean(train_losses)
+			train_acc = train_acc / len(train_loader.sampler)
+			if verbose:
+				print("acc {} / loss {} / time {}\n".format(train_acc, train_loss, end_time - start_time))
+			history_loss.append(train_loss)
+			history_train_acc.append(train_acc)
+			history_train_time.append(end_time - start_time)
+
+			cm = ConfusionMatrix(adapter.get_num_labels(config))
+			test_logits = []
+			test_labels = []
+			classification_model.eval()
+			if verbose:
+				print('(test)')
+			start_time = time.time()
+			with torch.no_grad():
+				for batch_index, data in enumerate(test_loader):
+					if performance_config.compile_mode == 'torchscript' and traced_model is None:
+						# traced in eval mode, it shares the parameters so it follows the training
+						traced_model = torch.jit.trace(classification_model, adapter.model_inputs(data, device), strict=False, check_trace=False)
+						eval_model = traced_model
+					logit, label = adapter.forward(eval_model, data, device)
+					test_logits.append(logit)
+					test_labels.append(label)
+				logit = torch.cat(test_logits)
+				label = torch.cat(test_labels)
+				if getattr(test_dataset, 'sample_index', None) is not None:
+					# one prediction per review from the logits of its windows
+					logit = pool_window_logits(logit, test_dataset.sample_index, test_dataset.num_samples, config.window_pooling)
+					label = pool_window_values(label, test_dataset.sample_index, test_dataset.num_samples)
+				test_loss = loss_fn(logit, label).item()
+				predict = logit.argmax(1)
+			end_time = time.time()
+
+			test_acc = (predict==label).sum().item() / len(label)
+			for real_class_id, predict_class_id in zip(label.tolist(), predict.tolist()):
+				cm.add(real_class_id, predict_class_id)
+			if verbose:
+				print("acc {} / loss {}".format(test_acc, test_loss))
+				print("<confusion matrix>\n", pd.DataFrame(cm.get()))
+				print("\n")
+			history_test_acc.append(test_acc)
+			history_test_time.append(end_time - start_time)
+
+		return {
+			'loss': history_loss,
+			'train_acc': history_train_acc,
+			'test_acc': history_test_acc,
+			'train_time': history_train_time,
+			'test_time': history_test_time,
+			'optimizer': optimizer,
+			'last_loss': loss.item(),
+			'total_train_step': len(train_loader),
+		}
+
+# AdamW with the multi-tensor (foreach) or single-kernel (fused) implementation
+def make_optimizer(optimizer_grouped_parameters, learning_rate, implementation, device):
+	import torch
+	if implementation == 'auto':
+		implementation = 'fused' if torch.device(device).type == 'cuda' else 'foreach'
+	if implementation == 'fused':
+		options = {'fused': True}
+	elif implementation == 'foreach':
+		options = {'foreach': True}
+	elif implementation == 'for_loop':
+		options = {'foreach': False}
+	else:
+		raise ValueError("optimizer_implementation should be 'auto', 'fused', 'foreach' or 'for_loop', not {!r}".format(implementation))
+	# eps of transformers.AdamW, which the trainers used before
+	return torch.optim.AdamW(optimizer_grouped_parameters, lr=learning_rate, eps=1e-6, **options)
+
+def set_num_threads(performance_config):
+	import torch
+	if performance_config.num_threads is not None:
+		torch.set_num_threads(performance_config.num_threads)
+	if performance_config.num_interop_threads is not None and torch.get_num_interop_threads() != performance_config.num_interop_threads:
+		try:
+			torch.set_interop_threads(performance_config.num_interop_threads)
+		except RuntimeError:
+			# torch only allows this before the first parallel work of the process
+			print("num_interop_threads is ignored: it can only be set before torch runs anything in parallel")
+
+def make_trainer(config, performance_config = None):
+	from .kobert_config import KoBERTConfig
+	from .koelectra_config import KoELECTRAConfig
+	if isinstance(config, KoBERTConfig):
+		from .kobert_classification_trainer import KobertClassficationTrainer
+		return KobertClassficationTrainer(performance_config)
+	if isinstance(config, KoELECTRAConfig):
+		from .koelectra_classification_trainer import KoElectraClassificationTrainer
+		return KoElectraClassificationTrainer(performance_config)
+	raise TypeError("config should be KoBERTConfig or KoELECTRAConfig, not {}".format(type(config).__name__))